@@ -1,10 +1,15 @@
 import gc
 import pickle
+import threading
 import traceback
 from abc import ABCMeta
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import wraps
 from pathlib import Path
-from typing import Optional, Any, Tuple, List, Set, Union, Dict
+from typing import Optional, Any, Tuple, List, Set, Union, Dict, Callable
 
+from cachetools import TTLCache
+from cachetools.keys import hashkey
 from qbittorrentapi import TorrentFilesList
 from ruamel.yaml import CommentedMap
 from transmission_rpc import File
@@ -24,22 +29,150 @@ from app.schemas import TransferInfo, TransferTorrent, ExistMediaInfo, Downloadi
 from app.schemas.types import TorrentStatus, MediaType, MediaImageType, EventType
 from app.utils.object import ObjectUtils
 
+# 处理链方法的结果缓存及其锁
+_result_caches: List[Tuple[TTLCache, threading.RLock]] = []
+# 结果处理方式对应的执行方法
+_strategy_runners: Dict[str, Callable] = {}
+# 模块方法对应的执行方法，未登记的方法按通用方式处理
+_method_runners: Dict[str, Callable] = {}
+
+
+def strategy_runner(strategy: str) -> Callable:
+    """
+    登记结果处理方式的执行方法，需在使用该处理方式的处理链方法之前定义
+    :param strategy: 结果处理方式
+    """
+
+    def decorator(func: Callable) -> Callable:
+        _strategy_runners[strategy] = func
+        return func
+
+    return decorator
+
+
+def chain_method(method: str, strategy: str) -> Callable:
+    """
+    登记模块方法的结果处理方式，登记时即确定执行方法
+    :param method: 模块方法名，与调用 run_module 时的方法名一致
+    :param strategy: first_wins: 取第一个非空结果；merge_list: 合并所有模块返回的列表
+    :raises ValueError: 处理方式不存在，或同名方法已登记为其它处理方式
+    """
+    runner = _strategy_runners.get(strategy)
+    if not runner:
+        raise ValueError(f"模块方法 {method} 的结果处理方式 {strategy} 不存在")
+    registered = _method_runners.setdefault(method, runner)
+    if registered is not runner:
+        raise ValueError(f"模块方法 {method} 已登记为其它结果处理方式，不能再登记为 {strategy}")
+
+    def decorator(func: Callable) -> Callable:
+        return func
+
+    return decorator
+
+
+def ttl_cached(maxsize: int, ttl: int) -> Callable:
+    """
+    处理链方法结果缓存装饰器，只缓存非空结果
+    缓存键不含处理链实例，同一方法的缓存在各处理链实例间共享
+    缓存未命中时，相同参数的并发调用只执行一次，其余调用等待并共享该次结果
+    :param maxsize: 最大缓存数量
+    :param ttl: 缓存时间（秒）
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.RLock()
+        # 正在执行中的调用
+        inflight: Dict[tuple, Future] = {}
+        _result_caches.append((cache, lock))
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = hashkey(*args, **kwargs)
+            try:
+                hash(key)
+            except TypeError:
+                # 参数不可哈希，不使用缓存
+                return func(self, *args, **kwargs)
+            with lock:
+                result = cache.get(key)
+                if result is not None:
+                    return result
+                future = inflight.get(key)
+                if future is None:
+                    future = inflight[key] = Future()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                # 等待正在执行中的相同调用
+                return future.result()
+            try:
+                result = func(self, *args, **kwargs)
+                if result is not None:
+                    with lock:
+                        cache[key] = result
+                future.set_result(result)
+                return result
+            except BaseException as err:
+                # 包括 KeyboardInterrupt/SystemExit 等，确保等待中的调用不会被永久阻塞
+                future.set_exception(err)
+                raise
+            finally:
+                with lock:
+                    inflight.pop(key, None)
+
+        return wrapper
+
+    return decorator
+
 
 class ChainBase(metaclass=ABCMeta):
     """
     处理链基类
     """
 
+    __slots__ = ("_modulemanager", "_eventmanager", "messageoper", "messagehelper", "useroper")
+
+    # 消息发送线程池，单线程以保证消息顺序，服务关闭时由 stop_message_executor 停止
+    _message_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chain-msg")
+
     def __init__(self):
         """
         公共初始化
         """
-        self.modulemanager = ModuleManager()
-        self.eventmanager = EventManager()
+        self._modulemanager = None
+        self._eventmanager = None
         self.messageoper = MessageOper()
         self.messagehelper = MessageHelper()
         self.useroper = UserOper()
 
+    @property
+    def modulemanager(self) -> ModuleManager:
+        """
+        模块管理器，首次使用时获取
+        """
+        if self._modulemanager is None:
+            self._modulemanager = ModuleManager()
+        return self._modulemanager
+
+    @modulemanager.setter
+    def modulemanager(self, value: ModuleManager):
+        self._modulemanager = value
+
+    @property
+    def eventmanager(self) -> EventManager:
+        """
+        事件管理器，首次使用时获取
+        """
+        if self._eventmanager is None:
+            self._eventmanager = EventManager()
+        return self._eventmanager
+
+    @eventmanager.setter
+    def eventmanager(self, value: EventManager):
+        self._eventmanager = value
+
     @staticmethod
     def load_cache(filename: str) -> Any:
         """
@@ -78,36 +211,60 @@ class ChainBase(metaclass=ABCMeta):
         if cache_path.exists():
             Path(cache_path).unlink()
 
+    @staticmethod
+    def _as_hash_tuple(hashs: Union[str, list, tuple, None]) -> Optional[Tuple[str, ...]]:
+        """
+        将种子Hash统一转换为元组，为空时返回None
+        """
+        if not hashs:
+            return None
+        if isinstance(hashs, str):
+            return hashs,
+        return tuple(hashs)
+
     def run_module(self, method: str, *args, **kwargs) -> Any:
         """
         运行包含该方法的所有模块，然后返回结果
         当kwargs包含命名参数raise_exception时，如模块方法抛出异常且raise_exception为True，则同步抛出异常
         """
+        modules = self.modulemanager.get_method_modules(method)
+        if not modules:
+            return None
+        if len(modules) == 1:
+            # 只有一个模块时直接调用，各处理方式结果一致
+            module, func = modules[0]
+            try:
+                return func(*args, **kwargs)
+            except Exception as err:
+                if kwargs.get("raise_exception"):
+                    raise
+                self.__handle_module_error(module, method, err)
+                return None
+        runner = _method_runners.get(method, ChainBase.__run_chained)
+        return runner(self, method, modules, args, kwargs)
 
-        def is_result_empty(ret):
-            """
-            判断结果是否为空
-            """
-            if isinstance(ret, tuple):
-                return all(value is None for value in ret)
-            else:
-                return result is None
+    @staticmethod
+    def __is_result_empty(ret: Any) -> bool:
+        """
+        判断结果是否为空
+        """
+        if ret is None:
+            return True
+        if isinstance(ret, tuple):
+            for value in ret:
+                if value is not None:
+                    return False
+            return True
+        return False
 
-        logger.debug(f"请求模块执行：{method} ...")
+    def __run_chained(self, method: str, modules: List[tuple], args: tuple, kwargs: dict) -> Any:
+        """
+        通用执行方式：结果为空时继续执行下一模块，结果与方法签名一致时传入下一模块，结果为列表时合并
+        """
         result = None
-        modules = self.modulemanager.get_running_modules(method)
-        # 按优先级排序
-        modules = sorted(modules, key=lambda x: x.get_priority())
-        for module in modules:
-            module_id = module.__class__.__name__
-            try:
-                module_name = module.get_name()
-            except Exception as err:
-                logger.debug(f"获取模块名称出错：{str(err)}")
-                module_name = module_id
+        for module, func in modules:
             try:
-                func = getattr(module, method)
-                if is_result_empty(result):
+                if self.__is_result_empty(result):
                     # 返回None，第一次执行或者需继续执行下一模块
                     result = func(*args, **kwargs)
                 elif ObjectUtils.check_signature(func, result):
@@ -124,24 +281,79 @@ class ChainBase(metaclass=ABCMeta):
             except Exception as err:
                 if kwargs.get("raise_exception"):
                     raise
-                logger.error(
-                    f"运行模块 {module_id}.{method} 出错：{str(err)}\n{traceback.format_exc()}")
-                self.messagehelper.put(title=f"{module_name}发生了错误",
-                                       message=str(err),
-                                       role="system")
-                self.eventmanager.send_event(
-                    EventType.SystemError,
-                    {
-                        "type": "module",
-                        "module_id": module_id,
-                        "module_name": module_name,
-                        "module_method": method,
-                        "error": str(err),
-                        "traceback": traceback.format_exc()
-                    }
-                )
+                self.__handle_module_error(module, method, err)
         return result
 
+    @strategy_runner("first_wins")
+    def __run_first_wins(self, method: str, modules: List[tuple], args: tuple, kwargs: dict) -> Any:
+        """
+        取第一个非空结果：依次执行模块，直到某一模块返回非空结果
+        """
+        result = None
+        for module, func in modules:
+            try:
+                result = func(*args, **kwargs)
+            except Exception as err:
+                if kwargs.get("raise_exception"):
+                    raise
+                self.__handle_module_error(module, method, err)
+                continue
+            if not self.__is_result_empty(result):
+                break
+        return result
+
+    @strategy_runner("merge_list")
+    def __run_merge_list(self, method: str, modules: List[tuple], args: tuple, kwargs: dict) -> Any:
+        """
+        合并列表结果：并发执行所有模块，将返回的列表按模块优先级合并
+        单个模块时由 run_module 直接调用，不会进入此方法
+        """
+        with ThreadPoolExecutor(max_workers=len(modules)) as executor:
+            futures = [executor.submit(func, *args, **kwargs) for _, func in modules]
+        result = None
+        for future, (module, _) in zip(futures, modules):
+            try:
+                temp = future.result()
+            except Exception as err:
+                if kwargs.get("raise_exception"):
+                    raise
+                self.__handle_module_error(module, method, err)
+                continue
+            if result is None:
+                result = temp
+            elif isinstance(temp, list):
+                result.extend(temp)
+        return result
+
+    def __handle_module_error(self, module: Any, method: str, err: Exception) -> None:
+        """
+        记录模块运行错误，并发送系统错误消息和事件
+        """
+        # 异常堆栈只格式化一次，日志与事件共用
+        err_traceback = traceback.format_exc()
+        module_id = module.__class__.__name__
+        try:
+            module_name = module.get_name()
+        except Exception as e:
+            logger.debug(f"获取模块名称出错：{str(e)}")
+            module_name = module_id
+        logger.error(f"运行模块 {module_id}.{method} 出错：{str(err)}\n{err_traceback}")
+        self.messagehelper.put(title=f"{module_name}发生了错误",
+                               message=str(err),
+                               role="system")
+        self.eventmanager.send_event(
+            EventType.SystemError,
+            {
+                "type": "module",
+                "module_id": module_id,
+                "module_name": module_name,
+                "module_method": method,
+                "error": str(err),
+                "traceback": err_traceback
+            }
+        )
+
+    @chain_method("recognize_media", "first_wins")
     def recognize_media(self, meta: MetaBase = None,
                         mtype: MediaType = None,
                         tmdbid: int = None,
@@ -172,6 +384,7 @@ class ChainBase(metaclass=ABCMeta):
         return self.run_module("recognize_media", meta=meta, mtype=mtype,
                                tmdbid=tmdbid, doubanid=doubanid, bangumiid=bangumiid, cache=cache)
 
+    @chain_method("match_doubaninfo", "first_wins")
     def match_doubaninfo(self, name: str, imdbid: str = None,
                          mtype: MediaType = None, year: str = None, season: int = None,
                          raise_exception: bool = False) -> Optional[dict]:
@@ -187,6 +400,7 @@ class ChainBase(metaclass=ABCMeta):
         return self.run_module("match_doubaninfo", name=name, imdbid=imdbid,
                                mtype=mtype, year=year, season=season, raise_exception=raise_exception)
 
+    @chain_method("match_tmdbinfo", "first_wins")
     def match_tmdbinfo(self, name: str, mtype: MediaType = None,
                        year: str = None, season: int = None) -> Optional[dict]:
         """
@@ -223,6 +437,8 @@ class ChainBase(metaclass=ABCMeta):
                                image_prefix=image_prefix, image_type=image_type,
                                season=season, episode=episode)
 
+    @chain_method("douban_info", "first_wins")
+    @ttl_cached(maxsize=settings.CACHE_CONF["douban"], ttl=300)
     def douban_info(self, doubanid: str, mtype: MediaType = None,
                     raise_exception: bool = False) -> Optional[dict]:
         """
@@ -234,6 +450,8 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("douban_info", doubanid=doubanid, mtype=mtype, raise_exception=raise_exception)
 
+    @chain_method("tvdb_info", "first_wins")
+    @ttl_cached(maxsize=settings.CACHE_CONF["tmdb"], ttl=300)
     def tvdb_info(self, tvdbid: int) -> Optional[dict]:
         """
         获取TVDB信息
@@ -242,6 +460,8 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("tvdb_info", tvdbid=tvdbid)
 
+    @chain_method("tmdb_info", "first_wins")
+    @ttl_cached(maxsize=settings.CACHE_CONF["tmdb"], ttl=300)
     def tmdb_info(self, tmdbid: int, mtype: MediaType, season: int = None) -> Optional[dict]:
         """
         获取TMDB信息
@@ -252,6 +472,7 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("tmdb_info", tmdbid=tmdbid, mtype=mtype, season=season)
 
+    @chain_method("bangumi_info", "first_wins")
     def bangumi_info(self, bangumiid: int) -> Optional[dict]:
         """
         获取Bangumi信息
@@ -300,6 +521,7 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("search_persons", name=name)
 
+    @chain_method("search_torrents", "merge_list")
     def search_torrents(self, site: CommentedMap,
                         keywords: List[str],
                         mtype: MediaType = None,
@@ -315,6 +537,7 @@ class ChainBase(metaclass=ABCMeta):
         return self.run_module("search_torrents", site=site, keywords=keywords,
                                mtype=mtype, page=page)
 
+    @chain_method("refresh_torrents", "merge_list")
     def refresh_torrents(self, site: CommentedMap) -> List[TorrentInfo]:
         """
         获取站点最新一页的种子，多个站点需要多线程处理
@@ -379,7 +602,7 @@ class ChainBase(metaclass=ABCMeta):
         :param downloader:  下载器
         :return: 下载器中符合状态的种子列表
         """
-        return self.run_module("list_torrents", status=status, hashs=hashs, downloader=downloader)
+        return self.run_module("list_torrents", status=status, hashs=self._as_hash_tuple(hashs), downloader=downloader)
 
     def transfer(self, fileitem: FileItem, meta: MetaBase, mediainfo: MediaInfo,
                  target_directory: TransferDirectoryConf = None,
@@ -411,13 +634,13 @@ class ChainBase(metaclass=ABCMeta):
                                library_category_folder=library_category_folder,
                                episodes_info=episodes_info)
 
-    def transfer_completed(self, hashs: str, downloader: str = None) -> None:
+    def transfer_completed(self, hashs: Union[str, list], downloader: str = None) -> None:
         """
         下载器转移完成后的处理
         :param hashs:  种子Hash
         :param downloader:  下载器
         """
-        return self.run_module("transfer_completed", hashs=hashs, downloader=downloader)
+        return self.run_module("transfer_completed", hashs=self._as_hash_tuple(hashs), downloader=downloader)
 
     def remove_torrents(self, hashs: Union[str, list], delete_file: bool = True,
                         downloader: str = None) -> bool:
@@ -428,7 +651,8 @@ class ChainBase(metaclass=ABCMeta):
         :param downloader:  下载器
         :return: bool
         """
-        return self.run_module("remove_torrents", hashs=hashs, delete_file=delete_file, downloader=downloader)
+        return self.run_module("remove_torrents", hashs=self._as_hash_tuple(hashs), delete_file=delete_file,
+                               downloader=downloader)
 
     def start_torrents(self, hashs: Union[list, str], downloader: str = None) -> bool:
         """
@@ -437,7 +661,7 @@ class ChainBase(metaclass=ABCMeta):
         :param downloader:  下载器
         :return: bool
         """
-        return self.run_module("start_torrents", hashs=hashs, downloader=downloader)
+        return self.run_module("start_torrents", hashs=self._as_hash_tuple(hashs), downloader=downloader)
 
     def stop_torrents(self, hashs: Union[list, str], downloader: str = None) -> bool:
         """
@@ -446,7 +670,7 @@ class ChainBase(metaclass=ABCMeta):
         :param downloader:  下载器
         :return: bool
         """
-        return self.run_module("stop_torrents", hashs=hashs, downloader=downloader)
+        return self.run_module("stop_torrents", hashs=self._as_hash_tuple(hashs), downloader=downloader)
 
     def torrent_files(self, tid: str,
                       downloader: str = None) -> Optional[Union[TorrentFilesList, List[File]]]:
@@ -458,6 +682,7 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("torrent_files", tid=tid, downloader=downloader)
 
+    @chain_method("media_exists", "first_wins")
     def media_exists(self, mediainfo: MediaInfo, itemid: str = None,
                      server: str = None) -> Optional[ExistMediaInfo]:
         """
@@ -477,11 +702,11 @@ class ChainBase(metaclass=ABCMeta):
         """
         return self.run_module("media_files", mediainfo=mediainfo)
 
-    def post_message(self, message: Notification) -> None:
+    def post_message(self, message: Notification, block: bool = False) -> None:
         """
-        发送消息
+        发送消息，默认在后台线程中发送
         :param message:  消息体
-        :return: 成功或失败
+        :param block:  是否等待发送完成
         """
         logger.info(f"发送消息：channel={message.channel}，"
                     f"source={message.source},"
@@ -514,31 +739,57 @@ class ChainBase(metaclass=ABCMeta):
         self.messagehelper.put(message, role="user", title=message.title)
         self.messageoper.add(**message.dict())
         # 发送
-        self.run_module("post_message", message=message)
+        self.__send_message(block, "post_message", message=message)
 
-    def post_medias_message(self, message: Notification, medias: List[MediaInfo]) -> None:
+    def post_medias_message(self, message: Notification, medias: List[MediaInfo], block: bool = False) -> None:
         """
-        发送媒体信息选择列表
+        发送媒体信息选择列表，默认在后台线程中发送
         :param message:  消息体
         :param medias:  媒体列表
-        :return: 成功或失败
+        :param block:  是否等待发送完成
         """
         note_list = [media.to_dict() for media in medias]
         self.messagehelper.put(message, role="user", note=note_list, title=message.title)
         self.messageoper.add(**message.dict(), note=note_list)
-        return self.run_module("post_medias_message", message=message, medias=medias)
+        self.__send_message(block, "post_medias_message", message=message, medias=medias)
 
-    def post_torrents_message(self, message: Notification, torrents: List[Context]) -> None:
+    def post_torrents_message(self, message: Notification, torrents: List[Context], block: bool = False) -> None:
         """
-        发送种子信息选择列表
+        发送种子信息选择列表，默认在后台线程中发送
         :param message:  消息体
         :param torrents:  种子列表
-        :return: 成功或失败
+        :param block:  是否等待发送完成
         """
         note_list = [torrent.torrent_info.to_dict() for torrent in torrents]
         self.messagehelper.put(message, role="user", note=note_list, title=message.title)
         self.messageoper.add(**message.dict(), note=note_list)
-        return self.run_module("post_torrents_message", message=message, torrents=torrents)
+        self.__send_message(block, "post_torrents_message", message=message, torrents=torrents)
+
+    def __send_message(self, block: bool, method: str, **kwargs) -> None:
+        """
+        调用消息模块发送消息，统一提交到消息发送线程池以保证顺序，阻塞时等待发送完成
+        线程池只有一个线程、等待队列不设上限：所有渠道的消息按提交顺序串行发送，慢渠道会延后其后的消息，
+        以此换取消息不乱序；消息量远小于线程池处理能力，积压可以接受
+        """
+        if block and threading.current_thread().name.startswith("chain-msg"):
+            # 已在消息发送线程中，直接发送，避免等待自身
+            self.run_module(method, **kwargs)
+            return
+        try:
+            future = self._message_executor.submit(self.run_module, method, **kwargs)
+        except RuntimeError:
+            # 线程池已关闭，直接发送
+            self.run_module(method, **kwargs)
+            return
+        if block:
+            future.result()
+
+    @classmethod
+    def stop_message_executor(cls) -> None:
+        """
+        停止消息发送线程池，等待已提交的消息发送完成
+        """
+        cls._message_executor.shutdown(wait=True)
 
     def metadata_img(self, mediainfo: MediaInfo, season: int = None, episode: int = None) -> Optional[dict]:
         """
@@ -572,4 +823,7 @@ class ChainBase(metaclass=ABCMeta):
         """
         清理缓存，模块实现该接口响应清理缓存事件
         """
+        for cache, lock in _result_caches:
+            with lock:
+                cache.clear()
         self.run_module("clear_cache")
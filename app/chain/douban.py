@@ -1,7 +1,8 @@
 from typing import Optional, List
 
 from app import schemas
-from app.chain import ChainBase
+from app.chain import ChainBase, ttl_cached
+from app.core.config import settings
 from app.core.context import MediaInfo
 from app.schemas import MediaType
 from app.utils.singleton import Singleton
@@ -27,6 +28,7 @@ class DoubanChain(ChainBase, metaclass=Singleton):
         """
         return self.run_module("douban_person_credits", person_id=person_id, page=page)
 
+    @ttl_cached(maxsize=settings.CACHE_CONF["douban"], ttl=300)
     def movie_top250(self, page: int = 1, count: int = 30) -> Optional[List[MediaInfo]]:
         """
         获取豆瓣电影TOP250
@@ -53,6 +55,7 @@ class DoubanChain(ChainBase, metaclass=Singleton):
         """
         return self.run_module("tv_weekly_global", page=page, count=count)
 
+    @ttl_cached(maxsize=settings.CACHE_CONF["douban"], ttl=30)
     def douban_discover(self, mtype: MediaType, sort: str, tags: str,
                         page: int = 0, count: int = 30) -> Optional[List[MediaInfo]]:
         """
@@ -3,6 +3,7 @@ import copy
 import json
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple, Set, Dict, Union
 
@@ -30,6 +31,9 @@ class DownloadChain(ChainBase):
     下载处理链
     """
 
+    # 批量检查媒体库的最大并发数
+    _max_exists_workers = 5
+
     def __init__(self):
         super().__init__()
         self.torrent = TorrentHelper()
@@ -877,6 +881,30 @@ class DownloadChain(ChainBase):
             # 全部存在
             return True, no_exists
 
+    def get_no_exists_infos(self, items: List[Tuple[MetaBase, MediaInfo, Dict[int, int]]]
+                            ) -> List[Tuple[bool, Dict[Union[int, str], Dict[int, NotExistMediaInfo]]]]:
+        """
+        批量检查媒体库，多个媒体时并发查询，避免逐个等待媒体服务器响应
+        :param items: [(元数据, 已识别的媒体信息, 电视剧每季的总集数)]
+        :return: 与传入顺序一一对应的 get_no_exists_info 结果，系统停止时只返回已完成的部分
+        """
+        if len(items) <= 1:
+            return [self.get_no_exists_info(meta=meta, mediainfo=mediainfo, totals=totals)
+                    for meta, mediainfo, totals in items]
+        results = []
+        executor = ThreadPoolExecutor(max_workers=min(len(items), self._max_exists_workers))
+        futures = [executor.submit(self.get_no_exists_info, meta=meta, mediainfo=mediainfo, totals=totals)
+                   for meta, mediainfo, totals in items]
+        try:
+            for future in futures:
+                if global_vars.is_system_stopped:
+                    # 系统停止时不再等待剩余查询
+                    break
+                results.append(future.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
     def remote_downloading(self, channel: MessageChannel, userid: Union[str, int] = None, source: str = None):
         """
         查询正在下载的任务，并发送消息
@@ -522,25 +522,14 @@ class SubscribeChain(ChainBase):
 
         return ret_sites
 
-    def match(self, torrents: Dict[str, List[Context]]):
+    def __recognize_subscribes(self, subscribes: List[Subscribe]) -> List[Tuple[Subscribe, MetaBase, MediaInfo]]:
         """
-        从缓存中匹配订阅，并自动下载
+        生成订阅的元数据并识别媒体信息，跳过类型错误或未识别到媒体信息的订阅
         """
-        if not torrents:
-            logger.warn('没有缓存资源，无法匹配订阅')
-            return
-
-        # 记录重新识别过的种子
-        _recognize_cached = []
-
-        # 所有订阅
-        subscribes = self.subscribeoper.list('R')
-        # 遍历订阅
+        ret_medias = []
         for subscribe in subscribes:
             if global_vars.is_system_stopped:
                 break
-            logger.info(f'开始匹配订阅，标题：{subscribe.name} ...')
-            mediakey = subscribe.tmdbid or subscribe.doubanid
             # 生成元数据
             meta = MetaInfo(subscribe.name)
             meta.year = subscribe.year
@@ -550,10 +539,6 @@ class SubscribeChain(ChainBase):
             except ValueError:
                 logger.error(f'订阅 {subscribe.name} 类型错误：{subscribe.type}')
                 continue
-            # 订阅的站点域名列表
-            domains = []
-            if subscribe.sites:
-                domains = self.siteoper.get_domains_by_ids(subscribe.sites)
             # 识别媒体信息
             mediainfo: MediaInfo = self.recognize_media(meta=meta, mtype=meta.type,
                                                         tmdbid=subscribe.tmdbid,
@@ -563,20 +548,58 @@ class SubscribeChain(ChainBase):
                 logger.warn(
                     f'未识别到媒体信息，标题：{subscribe.name}，tmdbid：{subscribe.tmdbid}，doubanid：{subscribe.doubanid}')
                 continue
+            ret_medias.append((subscribe, meta, mediainfo))
+        return ret_medias
+
+    @staticmethod
+    def __get_subscribe_totals(subscribe: Subscribe) -> Dict[int, int]:
+        """
+        获取订阅每季总集数
+        """
+        if subscribe.season and subscribe.total_episode:
+            return {
+                subscribe.season: subscribe.total_episode
+            }
+        return {}
+
+    def match(self, torrents: Dict[str, List[Context]]):
+        """
+        从缓存中匹配订阅，并自动下载
+        """
+        if not torrents:
+            logger.warn('没有缓存资源，无法匹配订阅')
+            return
+
+        # 记录重新识别过的种子
+        _recognize_cached = []
+
+        # 所有订阅
+        subscribes = self.subscribeoper.list('R')
+        # 识别订阅的媒体信息
+        subscribe_medias = self.__recognize_subscribes(subscribes)
+        # 批量查询非洗版订阅缺失的媒体信息
+        check_medias = [(subscribe, meta, mediainfo) for subscribe, meta, mediainfo in subscribe_medias
+                        if not subscribe.best_version]
+        exists_infos = self.downloadchain.get_no_exists_infos(
+            [(meta, mediainfo, self.__get_subscribe_totals(subscribe))
+             for subscribe, meta, mediainfo in check_medias]
+        )
+        exists_infos = {subscribe.id: info for (subscribe, _, _), info in zip(check_medias, exists_infos)}
+        # 遍历订阅
+        for subscribe, meta, mediainfo in subscribe_medias:
+            if global_vars.is_system_stopped:
+                break
+            logger.info(f'开始匹配订阅，标题：{subscribe.name} ...')
+            mediakey = subscribe.tmdbid or subscribe.doubanid
+            # 订阅的站点域名列表
+            domains = []
+            if subscribe.sites:
+                domains = self.siteoper.get_domains_by_ids(subscribe.sites)
             # 非洗版
             if not subscribe.best_version:
-                # 每季总集数
-                totals = {}
-                if subscribe.season and subscribe.total_episode:
-                    totals = {
-                        subscribe.season: subscribe.total_episode
-                    }
-                # 查询缺失的媒体信息
-                exist_flag, no_exists = self.downloadchain.get_no_exists_info(
-                    meta=meta,
-                    mediainfo=mediainfo,
-                    totals=totals
-                )
+                if subscribe.id not in exists_infos:
+                    continue
+                exist_flag, no_exists = exists_infos[subscribe.id]
             else:
                 # 洗版
                 exist_flag = False
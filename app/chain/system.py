@@ -38,7 +38,8 @@ class SystemChain(ChainBase, metaclass=Singleton):
         """
         if channel and userid:
             self.post_message(Notification(channel=channel, source=source,
-                                           title="系统正在重启，请耐心等候！", userid=userid))
+                                           title="系统正在重启，请耐心等候！", userid=userid),
+                              block=True)
             # 保存重启信息
             self.save_cache({
                 "channel": channel.value,
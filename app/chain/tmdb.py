@@ -4,7 +4,8 @@ from typing import Optional, List
 from cachetools import cached, TTLCache
 
 from app import schemas
-from app.chain import ChainBase
+from app.chain import ChainBase, ttl_cached
+from app.core.config import settings
 from app.core.context import MediaInfo
 from app.schemas import MediaType
 from app.utils.singleton import Singleton
@@ -15,6 +16,7 @@ class TmdbChain(ChainBase, metaclass=Singleton):
     TheMovieDB处理链，单例运行
     """
 
+    @ttl_cached(maxsize=settings.CACHE_CONF["tmdb"], ttl=30)
     def tmdb_discover(self, mtype: MediaType, sort_by: str, with_genres: str,
                       with_original_language: str, page: int = 1) -> Optional[List[MediaInfo]]:
         """
@@ -1,5 +1,7 @@
 import re
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Union
 
 from cachetools import cached, TTLCache
@@ -28,6 +30,8 @@ class TorrentsChain(ChainBase, metaclass=Singleton):
 
     _spider_file = "__torrents_cache__"
     _rss_file = "__rss_cache__"
+    # 刷新站点的最大并发数
+    _max_refresh_workers = 10
 
     def __init__(self):
         super().__init__()
@@ -72,7 +76,7 @@ class TorrentsChain(ChainBase, metaclass=Singleton):
         self.remove_cache(self._rss_file)
         logger.info(f'种子缓存数据清理完成')
 
-    @cached(cache=TTLCache(maxsize=128, ttl=595))
+    @cached(cache=TTLCache(maxsize=128, ttl=595), lock=threading.Lock())
     def browse(self, domain: str) -> List[TorrentInfo]:
         """
         浏览站点首页内容，返回种子清单，TTL缓存10分钟
@@ -85,7 +89,7 @@ class TorrentsChain(ChainBase, metaclass=Singleton):
             return []
         return self.refresh_torrents(site=site)
 
-    @cached(cache=TTLCache(maxsize=128, ttl=295))
+    @cached(cache=TTLCache(maxsize=128, ttl=295), lock=threading.Lock())
     def rss(self, domain: str) -> List[TorrentInfo]:
         """
         获取站点RSS内容，返回种子清单，TTL缓存5分钟
@@ -153,25 +157,18 @@ class TorrentsChain(ChainBase, metaclass=Singleton):
             torrents_cache[_domain] = [_torrent for _torrent in _torrents
                                        if not self.torrenthelper.is_invalid(_torrent.torrent_info.enclosure)]
 
-        # 所有站点索引
-        indexers = self.siteshelper.get_indexers()
+        # 所有站点索引，未开启的站点不刷新
+        indexers = [indexer for indexer in self.siteshelper.get_indexers()
+                    if not sites or indexer.get("id") in sites]
         # 需要刷新的站点domain
-        domains = []
+        domains = [StringUtils.get_url_domain(indexer.get("domain")) for indexer in indexers]
+        # 多线程获取站点种子
+        site_torrents = self.__fetch_all_sites(stype=stype, domains=domains)
         # 遍历站点缓存资源
-        for indexer in indexers:
+        for indexer, domain in zip(indexers, domains):
             if global_vars.is_system_stopped:
                 break
-            # 未开启的站点不刷新
-            if sites and indexer.get("id") not in sites:
-                continue
-            domain = StringUtils.get_url_domain(indexer.get("domain"))
-            domains.append(domain)
-            if stype == "spider":
-                # 刷新首页种子
-                torrents: List[TorrentInfo] = self.browse(domain=domain)
-            else:
-                # 刷新RSS种子
-                torrents: List[TorrentInfo] = self.rss(domain=domain)
+            torrents: List[TorrentInfo] = site_torrents.get(domain) or []
             # 按pubdate降序排列
             torrents.sort(key=lambda x: x.pubdate or '', reverse=True)
             # 取前N条
@@ -233,6 +230,32 @@ class TorrentsChain(ChainBase, metaclass=Singleton):
             torrents_cache = {k: v for k, v in torrents_cache.items() if k in domains}
         return torrents_cache
 
+    def __fetch_all_sites(self, stype: str, domains: List[str]) -> Dict[str, List[TorrentInfo]]:
+        """
+        多线程获取多个站点的最新种子
+        :param stype: 缓存类型，spider:爬虫缓存，rss:rss缓存
+        :param domains: 站点域名列表
+        :return: {domain: [TorrentInfo]}
+        """
+        if not domains:
+            return {}
+        results = {}
+        func = self.browse if stype == "spider" else self.rss
+        executor = ThreadPoolExecutor(max_workers=min(len(domains), self._max_refresh_workers))
+        all_task = {executor.submit(func, domain=domain): domain for domain in domains}
+        for future in as_completed(all_task):
+            if global_vars.is_system_stopped:
+                # 系统停止时不再等待剩余站点
+                executor.shutdown(wait=False, cancel_futures=True)
+                return results
+            domain = all_task[future]
+            try:
+                results[domain] = future.result()
+            except Exception as err:
+                logger.error(f'获取站点 {domain} 种子出错：{str(err)} - {traceback.format_exc()}')
+        executor.shutdown(wait=False)
+        return results
+
     def __renew_rss_url(self, domain: str, site: dict):
         """
         保留原配置生成新的rss地址
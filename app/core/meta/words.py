@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List, Tuple
 
 import cn2an
@@ -13,6 +14,8 @@ class WordsMatcher(metaclass=Singleton):
 
     def __init__(self):
         self.systemconfig = SystemConfigOper()
+        # 最近一次使用的识别词列表及对应元组，识别词未变化时复用同一元组作为缓存键
+        self._last_words: Tuple[List[str], Tuple[str, ...]] = ([], ())
 
     def prepare(self, title: str, custom_words: List[str] = None) -> Tuple[str, List[str]]:
         """
@@ -21,9 +24,22 @@ class WordsMatcher(metaclass=Singleton):
         2：被替换词 => 替换词
         3：前定位词 <> 后定位词 >> 偏移量（EP）
         """
-        appley_words = []
         # 读取自定义识别词
         words: List[str] = custom_words or self.systemconfig.get(SystemConfigKey.CustomIdentifiers) or []
+        last_list, words_key = self._last_words
+        if words != last_list:
+            words_key = tuple(words)
+            self._last_words = (list(words), words_key)
+        title, appley_words = self.__prepare(title, words_key)
+        return title, list(appley_words)
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def __prepare(title: str, words: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+        """
+        使用识别词预处理标题，结果按标题和识别词缓存
+        """
+        appley_words = []
         for word in words:
             if not word or word.startswith("#"):
                 continue
@@ -40,25 +56,25 @@ class WordsMatcher(metaclass=Singleton):
                     # 集偏移
                     offsets = str(re.findall(r'>>\s*(.*?)$', word)[0]).strip()
                     # 替换词
-                    title, message, state = self.__replace_regex(title, thc, bthc)
+                    title, message, state = WordsMatcher.__replace_regex(title, thc, bthc)
                     if state:
                         # 替换词成功再进行集偏移
-                        title, message, state = self.__episode_offset(title, pyq, pyh, offsets)
+                        title, message, state = WordsMatcher.__episode_offset(title, pyq, pyh, offsets)
                 elif word.count(" => "):
                     # 替换词
                     strings = word.split(" => ")
-                    title, message, state = self.__replace_regex(title, strings[0], strings[1])
+                    title, message, state = WordsMatcher.__replace_regex(title, strings[0], strings[1])
                 elif word.count(" >> ") and word.count(" <> "):
                     # 集偏移
                     strings = word.split(" <> ")
                     offsets = strings[1].split(" >> ")
                     strings[1] = offsets[0]
-                    title, message, state = self.__episode_offset(title, strings[0], strings[1], offsets[1])
+                    title, message, state = WordsMatcher.__episode_offset(title, strings[0], strings[1], offsets[1])
                 else:
                     # 屏蔽词
                     if not word.strip():
                         continue
-                    title, message, state = self.__replace_regex(title, word, "")
+                    title, message, state = WordsMatcher.__replace_regex(title, word, "")
 
                 if state:
                     appley_words.append(word)
@@ -66,7 +82,7 @@ class WordsMatcher(metaclass=Singleton):
             except Exception as err:
                 logger.warn(f"自定义识别词 {word} 预处理标题失败：{str(err)} - 标题：{title}")
 
-        return title, appley_words
+        return title, tuple(appley_words)
 
     @staticmethod
     def __replace_regex(title: str, replaced: str, replace: str) -> Tuple[str, str, bool]:
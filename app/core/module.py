@@ -1,5 +1,6 @@
+import threading
 import traceback
-from typing import Generator, Optional, Tuple, Any
+from typing import Generator, Optional, Tuple, Any, List, Callable
 
 from app.core.config import settings
 from app.core.event import eventmanager
@@ -19,6 +20,12 @@ class ModuleManager(metaclass=Singleton):
     _modules: dict = {}
     # 运行态模块列表
     _running_modules: dict = {}
+    # 方法对应的运行态模块缓存
+    _method_modules: dict = {}
+    # 方法缓存的版本号，模块加载时递增，用于丢弃加载期间计算的结果
+    _method_generation: int = 0
+    # 方法缓存锁
+    _method_lock = threading.Lock()
 
     def __init__(self):
         self.load_modules()
@@ -34,6 +41,7 @@ class ModuleManager(metaclass=Singleton):
         )
         self._running_modules = {}
         self._modules = {}
+        self.clear_method_cache()
         for module in modules:
             module_id = module.__name__
             self._modules[module_id] = module
@@ -48,6 +56,8 @@ class ModuleManager(metaclass=Singleton):
                     logger.info(f"Moudle Loaded：{module_id}")
             except Exception as err:
                 logger.error(f"Load Moudle Error：{module_id}，{str(err)} - {traceback.format_exc()}", exc_info=True)
+        # 加载过程中可能已缓存了不完整的模块列表
+        self.clear_method_cache()
 
     def stop(self):
         """
@@ -124,6 +134,32 @@ class ModuleManager(metaclass=Singleton):
                     and ObjectUtils.check_method(getattr(module, method)):
                 yield module
 
+    def get_method_modules(self, method: str) -> List[Tuple[Any, Callable]]:
+        """
+        获取实现了同一方法的模块及其绑定方法列表（按优先级排序），结果按方法名缓存，模块重新加载时失效
+        """
+        modules = self._method_modules.get(method)
+        if modules is None:
+            generation = self._method_generation
+            modules = [(module, getattr(module, method))
+                       for module in sorted(self.get_running_modules(method), key=lambda x: x.get_priority())]
+            with self._method_lock:
+                # 计算期间模块发生了重新加载，结果可能不完整，不缓存
+                if generation != self._method_generation:
+                    return modules
+                self._method_modules[method] = modules
+            logger.debug(f"模块方法 {method} 共 {len(modules)} 个实现模块："
+                         f"{', '.join(module.__class__.__name__ for module, _ in modules)}")
+        return modules
+
+    def clear_method_cache(self):
+        """
+        清除方法对应的模块缓存
+        """
+        with self._method_lock:
+            self._method_generation += 1
+            self._method_modules = {}
+
     def get_running_type_modules(self, module_type: ModuleType) -> Generator:
         """
         获取指定类型的模块列表
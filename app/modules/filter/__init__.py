@@ -1,5 +1,5 @@
 import re
-from typing import List, Tuple, Union, Dict, Optional
+from typing import List, Tuple, Union, Dict, Optional, Iterable, Iterator
 
 from app.core.context import TorrentInfo, MediaInfo
 from app.core.metainfo import MetaInfo
@@ -202,38 +202,39 @@ class FilterModule(_ModuleBase):
         self.__init_custom_rules()
         # 查询规则表详情
         groups = self.rulehelper.get_rule_group_by_media(media=mediainfo, group_names=rule_groups)
-        if groups:
-            for group in groups:
-                # 过滤种子
-                torrent_list = self.__filter_torrents(
-                    rule_string=group.rule_string,
-                    rule_name=group.name,
-                    torrent_list=torrent_list,
-                    season_episodes=season_episodes
-                )
-        return torrent_list
+        if not groups:
+            return torrent_list
+        # 各规则组串联为生成器管道，种子逐个通过所有规则组，不生成中间列表
+        torrents: Iterable[TorrentInfo] = torrent_list
+        for group in groups:
+            # 过滤种子
+            torrents = self.__filter_torrents(
+                rule_string=group.rule_string,
+                rule_name=group.name,
+                torrents=torrents,
+                season_episodes=season_episodes
+            )
+        return list(torrents)
 
     def __filter_torrents(self, rule_string: str, rule_name: str,
-                          torrent_list: List[TorrentInfo],
-                          season_episodes: Dict[int, list]) -> List[TorrentInfo]:
+                          torrents: Iterable[TorrentInfo],
+                          season_episodes: Dict[int, list]) -> Iterator[TorrentInfo]:
         """
         过滤种子
         """
-        # 返回种子列表
-        ret_torrents = []
-        for torrent in torrent_list:
+        # 规则组只解析一次，所有种子共用
+        parsed_groups = self.__parse_rule_string(rule_string)
+        for torrent in torrents:
             # 季集数过滤
             if season_episodes \
                     and not self.__match_season_episodes(torrent, season_episodes):
                 continue
             # 能命中优先级的才返回
-            if not self.__get_order(torrent, rule_string):
+            if not self.__get_order(torrent, parsed_groups):
                 logger.debug(f"种子 {torrent.site_name} - {torrent.title} {torrent.description} "
                              f"不匹配 {rule_name} 过滤规则")
                 continue
-            ret_torrents.append(torrent)
-
-        return ret_torrents
+            yield torrent
 
     @staticmethod
     def __match_season_episodes(torrent: TorrentInfo, season_episodes: Dict[int, list]):
@@ -268,21 +269,26 @@ class FilterModule(_ModuleBase):
                 return False
         return True
 
-    def __get_order(self, torrent: TorrentInfo, rule_str: str) -> Optional[TorrentInfo]:
+    def __parse_rule_string(self, rule_str: str) -> List[Union[list, str]]:
+        """
+        解析多级规则字符串，返回按优先级排列的规则组
+        """
+        return [self.parser.parse(rule_group.strip()).as_list()[0]
+                for rule_group in rule_str.split('>')]
+
+    def __get_order(self, torrent: TorrentInfo, parsed_groups: List[Union[list, str]]) -> Optional[TorrentInfo]:
         """
         获取种子匹配的规则优先级，值越大越优先，未匹配时返回None
+        :param torrent: 种子
+        :param parsed_groups: 已解析的多级规则组
         """
-        # 多级规则
-        rule_groups = rule_str.split('>')
         # 优先级
         res_order = 100
         # 是否匹配
         matched = False
 
-        for rule_group in rule_groups:
-            # 解析规则组
-            parsed_group = self.parser.parse(rule_group.strip())
-            if self.__match_group(torrent, parsed_group.as_list()[0]):
+        for parsed_group in parsed_groups:
+            if self.__match_group(torrent, parsed_group):
                 # 出现匹配时中断
                 matched = True
                 logger.debug(f"种子 {torrent.site_name} - {torrent.title} 优先级为 {100 - res_order + 1}")
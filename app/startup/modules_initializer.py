@@ -26,6 +26,7 @@ from app.schemas import Notification, NotificationType
 from app.schemas.types import SystemConfigKey
 from app.db import close_database
 from app.db.systemconfig_oper import SystemConfigOper
+from app.chain import ChainBase
 from app.chain.command import CommandChain
 
 
@@ -110,6 +111,8 @@ def shutdown_modules(_: FastAPI):
     """
     # 停止信号
     global_vars.stop_system()
+    # 停止消息发送
+    ChainBase.stop_message_executor()
     # 停止模块
     ModuleManager().stop()
     # 停止插件
@@ -1,5 +1,7 @@
 import unittest
 
+from tests.test_chain_cache import ChainCacheTest
+from tests.test_chain_dispatch import ChainDispatchTest
 from tests.test_metainfo import MetaInfoTest
 
 if __name__ == '__main__':
@@ -8,6 +10,16 @@ if __name__ == '__main__':
     # 测试名称识别
     suite.addTest(MetaInfoTest('test_metainfo'))
 
+    # 测试处理链结果缓存
+    suite.addTest(ChainCacheTest('test_coalesce'))
+    suite.addTest(ChainCacheTest('test_base_exception'))
+
+    # 测试处理链模块调用
+    suite.addTest(ChainDispatchTest('test_first_wins'))
+    suite.addTest(ChainDispatchTest('test_merge_list'))
+    suite.addTest(ChainDispatchTest('test_chained'))
+    suite.addTest(ChainDispatchTest('test_raise_exception'))
+
     # 运行测试
     runner = unittest.TextTestRunner()
     runner.run(suite)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from unittest import TestCase
+
+from app.chain import ttl_cached
+
+
+class CachedChain:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @ttl_cached(maxsize=8, ttl=60)
+    def slow(self, value: int):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return value * 2
+
+    @ttl_cached(maxsize=8, ttl=60)
+    def interrupted(self, value: int):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        raise KeyboardInterrupt
+
+
+class ChainCacheTest(TestCase):
+    def setUp(self) -> None:
+        pass
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_coalesce(self):
+        chain = CachedChain()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(chain.slow(1))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(chain.calls, 1)
+        self.assertEqual(results, [2] * 5)
+        # 命中缓存
+        self.assertEqual(chain.slow(1), 2)
+        self.assertEqual(chain.calls, 1)
+
+    def test_base_exception(self):
+        chain = CachedChain()
+        errors = []
+
+        def call():
+            try:
+                chain.interrupted(1)
+            except KeyboardInterrupt:
+                errors.append(True)
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(chain.calls, 1)
+        self.assertEqual(len(errors), 5)
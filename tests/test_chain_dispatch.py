@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+from app.chain import ChainBase
+
+
+class FakeModule:
+    def __init__(self, name: str, priority: int, result=None, error: Exception = None):
+        self.name = name
+        self.priority = priority
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_priority(self) -> int:
+        return self.priority
+
+    def __call(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.error:
+            raise self.error
+        return self.result() if callable(self.result) else self.result
+
+    def match_tmdbinfo(self, *args, **kwargs):
+        return self.__call(*args, **kwargs)
+
+    def search_torrents(self, *args, **kwargs):
+        return self.__call(*args, **kwargs)
+
+
+class PipeModule(FakeModule):
+    def process(self, data: dict) -> dict:
+        self.calls.append(data)
+        return {**data, self.name: True}
+
+
+class FakeModuleManager:
+    def __init__(self, *modules):
+        self.modules = sorted(modules, key=lambda x: x.get_priority())
+
+    def get_method_modules(self, method: str):
+        return [(module, getattr(module, method)) for module in self.modules if hasattr(module, method)]
+
+
+class FakeChain(ChainBase):
+    def __init__(self, *modules):
+        self.modulemanager = FakeModuleManager(*modules)
+        self.errors = []
+
+    def _ChainBase__handle_module_error(self, module, method, err):
+        self.errors.append((module.name, method))
+
+
+class ChainDispatchTest(TestCase):
+    def setUp(self) -> None:
+        pass
+
+    def tearDown(self) -> None:
+        pass
+
+    def test_first_wins(self):
+        broken = FakeModule("broken", 1, error=ValueError("boom"))
+        empty = FakeModule("empty", 2)
+        hit = FakeModule("hit", 3, result={"id": 1})
+        unused = FakeModule("unused", 4, result={"id": 2})
+        chain = FakeChain(unused, hit, empty, broken)
+        self.assertEqual(chain.run_module("match_tmdbinfo", name="test"), {"id": 1})
+        self.assertEqual(chain.errors, [("broken", "match_tmdbinfo")])
+        self.assertEqual(len(empty.calls), 1)
+        self.assertEqual(unused.calls, [])
+
+    def test_merge_list(self):
+        first = FakeModule("first", 1, result=lambda: ["a", "b"])
+        broken = FakeModule("broken", 2, error=ValueError("boom"))
+        second = FakeModule("second", 3, result=lambda: ["c"])
+        chain = FakeChain(second, broken, first)
+        self.assertEqual(chain.run_module("search_torrents", site={}, keywords=[]), ["a", "b", "c"])
+        self.assertEqual(chain.errors, [("broken", "search_torrents")])
+
+    def test_chained(self):
+        first = PipeModule("first", 1)
+        second = PipeModule("second", 2)
+        chain = FakeChain(second, first)
+        self.assertEqual(chain.run_module("process", {"org": True}),
+                         {"org": True, "first": True, "second": True})
+        self.assertEqual(second.calls, [{"org": True, "first": True}])
+
+    def test_raise_exception(self):
+        # 单个模块直接调用
+        chain = FakeChain(FakeModule("broken", 1, error=ValueError("single")))
+        with self.assertRaises(ValueError):
+            chain.run_module("match_tmdbinfo", name="test", raise_exception=True)
+        self.assertEqual(chain.run_module("match_tmdbinfo", name="test"), None)
+        # 多个模块
+        chain = FakeChain(FakeModule("broken", 1, error=ValueError("multi")),
+                          FakeModule("hit", 2, result={"id": 1}))
+        with self.assertRaises(ValueError):
+            chain.run_module("match_tmdbinfo", name="test", raise_exception=True)
+        chain = FakeChain(FakeModule("broken", 1, error=ValueError("multi")),
+                          FakeModule("hit", 2, result=lambda: ["a"]))
+        with self.assertRaises(ValueError):
+            chain.run_module("search_torrents", site={}, keywords=[], raise_exception=True)